@@ -6,17 +6,26 @@ A Python interface for controlling the Zoom G3X multi-effects pedal via USB MIDI
 Supports patch switching, effect toggling, and parameter editing.
 
 Requirements:
+    Python 3.10+
     pip install mido python-rtmidi
 """
 
-import mido
+from __future__ import annotations
+
+import os
+import string
 import time
 import sys
 from dataclasses import dataclass, field
-from typing import Optional, List
+from typing import TYPE_CHECKING, Optional, List
+
+# mido probes the MIDI backends on import, so it is only imported by the
+# functions that talk to the device
+if TYPE_CHECKING:
+    import mido
 
 # Zoom G3X SysEx constants
-SYSEX_PREFIX = [0x52, 0x00, 0x59]  # Manufacturer ID + device
+SYSEX_PREFIX = b'\x52\x00\x59'  # Manufacturer ID + device
 MANUFACTURER_ID = 0x52  # Zoom
 
 # Commands
@@ -39,19 +48,59 @@ EFFECTS = {
     0x03: "Slicer",
 }
 
+# EFFECTS expanded to every possible ID byte, for direct indexing
+_EFFECT_NAMES = tuple(EFFECTS.get(i, f"Unknown (0x{i:02X})") for i in range(256))
+
 # Patch data structure constants
 PATCH_DATA_HEADER_SIZE = 5
 EFFECT_SLOT_SIZE = 14
 NUM_EFFECT_SLOTS = 6
 PATCH_NAME_OFFSET = 96
 PATCH_NAME_LENGTH = 11
+DECODED_SLOT_SIZE = 12  # Effect slot size in overflow-decoded data
+
+# (slot_num, start, end) of each effect slot in the decoded data
+_SLOT_TABLE = tuple((n, n * DECODED_SLOT_SIZE, (n + 1) * DECODED_SLOT_SIZE)
+                    for n in range(NUM_EFFECT_SLOTS))
+
+# Substrings identifying the G3X in a lowercased MIDI port name
+_G3X_PORT_MARKERS = ('zoom', 'g3x')
+
+# Last auto-detected G3X output port; only successful lookups are cached
+_found_port: Optional[str] = None
+
+# Command byte of the reply to each request that has one
+_REPLY_CMDS = {
+    CMD_GET_PATCH_DATA: 0x28,
+    CMD_GET_PROGRAM_NUM: 0x32,
+}
+
+# Response polling: requests with a known reply give up after _RX_TIMEOUT
+# seconds, others after _RX_TIMEOUT_NO_REPLY; the port is checked every _RX_POLL
+_RX_TIMEOUT = 0.25
+_RX_TIMEOUT_NO_REPLY = 0.1
+_RX_POLL = 0.002
+
+# Overflow decoding tables: _MSB_TABLES[n] maps an overflow byte to 0x80 if
+# its bit n is set, else 0x00
+_MSB_TABLES = tuple(bytes(((b >> n) & 0x01) << 7 for b in range(256)) for n in range(7))
+
+# Bytes outside printable ASCII, for stripping with bytes.translate()
+_NON_PRINTABLE = bytes(b for b in range(256) if not 32 <= b < 127)
+
+# Bytes allowed in a patch name window (printable ASCII or NUL padding); a
+# window is valid when deleting these with bytes.translate() leaves nothing
+_NAME_WINDOW_BYTES = bytes([0]) + bytes(range(32, 127))
+
+# Hex dump ASCII column: printable bytes as-is, everything else as '.'
+_ASCII_PREVIEW = bytes(b if 32 <= b < 127 else ord('.') for b in range(256))
 
 
 # =============================================================================
 # Patch Data Structures
 # =============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class EffectSlot:
     """Represents a single effect slot in a patch."""
     slot_num: int
@@ -63,10 +112,10 @@ class EffectSlot:
     @property
     def effect_name(self) -> str:
         """Get human-readable effect name."""
-        return EFFECTS.get(self.effect_id, f"Unknown (0x{self.effect_id:02X})")
+        return _EFFECT_NAMES[self.effect_id & 0xFF]
 
 
-@dataclass
+@dataclass(slots=True)
 class PatchData:
     """Represents a complete patch configuration."""
     raw_data: bytes
@@ -97,7 +146,7 @@ def decode_14bit(low: int, high: int) -> int:
     return (low & 0x7F) | ((high & 0x7F) << 7)
 
 
-def decode_overflow_bytes(data: List[int]) -> List[int]:
+def decode_overflow_bytes(data: bytes) -> bytes:
     """
     Decode Zoom's 7-bit overflow byte encoding into full 8-bit values.
 
@@ -110,33 +159,30 @@ def decode_overflow_bytes(data: List[int]) -> List[int]:
     - overflow bit 2 -> b2's bit 7
     - etc.
 
+    The payload is processed one column at a time (byte N of every 8-byte
+    group) with slicing, translate and big-int OR, so the Python-level loop
+    runs 7 times regardless of payload length.
+
     Args:
         data: Raw 7-bit encoded bytes
 
     Returns:
         Decoded 8-bit values (will be shorter than input since overflow bytes are consumed)
     """
-    result = []
-    i = 0
-
-    while i < len(data):
-        # First byte is the overflow byte containing MSBs for next 7 bytes
-        overflow = data[i]
-        i += 1
+    data = bytes(data)
+    overflow = data[0::8]
+    result = bytearray(len(data) - len(overflow))
 
-        # Process up to 7 following bytes
-        for bit_pos in range(7):
-            if i >= len(data):
-                break
-
-            byte_val = data[i]
-            # Extract the MSB from overflow byte and combine with the 7-bit value
-            msb = (overflow >> bit_pos) & 0x01
-            full_byte = byte_val | (msb << 7)
-            result.append(full_byte)
-            i += 1
+    for bit_pos in range(7):
+        column = data[bit_pos + 1::8]
+        if not column:
+            break
+        # MSBs for this column, taken from the overflow byte of each group
+        msbs = overflow[:len(column)].translate(_MSB_TABLES[bit_pos])
+        merged = int.from_bytes(column, 'big') | int.from_bytes(msbs, 'big')
+        result[bit_pos::7] = merged.to_bytes(len(column), 'big')
 
-    return result
+    return bytes(result)
 
 
 def encode_overflow_bytes(data: List[int]) -> List[int]:
@@ -175,7 +221,7 @@ def encode_overflow_bytes(data: List[int]) -> List[int]:
     return result
 
 
-def parse_patch_data(data: List[int]) -> Optional[PatchData]:
+def parse_patch_data(data: bytes) -> Optional[PatchData]:
     """
     Parse raw SysEx patch data into a structured PatchData object.
 
@@ -193,8 +239,9 @@ def parse_patch_data(data: List[int]) -> Optional[PatchData]:
         return None
 
     # Verify header
-    if data[0:3] != SYSEX_PREFIX:
-        print(f"Invalid header: expected {SYSEX_PREFIX}, got {data[0:3]}")
+    if not data.startswith(SYSEX_PREFIX):
+        print(f"Invalid header: expected {SYSEX_PREFIX.hex(' ').upper()}, "
+              f"got {data[0:3].hex(' ').upper()}")
         return None
 
     # Command byte should be 0x28 (response to 0x29)
@@ -202,15 +249,14 @@ def parse_patch_data(data: List[int]) -> Optional[PatchData]:
         print(f"Unexpected command byte: 0x{data[3]:02X}")
         return None
 
-    raw_bytes = bytes(data)
-    patch = PatchData(raw_data=raw_bytes)
+    patch = PatchData(raw_data=data)
 
     # Decode the payload (everything after the 4-byte header) using overflow encoding
     payload = data[4:]
     decoded = decode_overflow_bytes(payload)
 
     # Store decoded data for debugging
-    patch.decoded_data = bytes(decoded)
+    patch.decoded_data = decoded
 
     # Parse patch name - in MS70-CDR it's at 0x84-0x8F in decoded data
     # For G3X with 108 raw bytes -> ~91 decoded bytes, name is likely near the end
@@ -218,17 +264,12 @@ def parse_patch_data(data: List[int]) -> Optional[PatchData]:
     patch.patch_name = ""
     for start in range(len(decoded) - 4):
         # Look for a run of printable ASCII
-        if all(32 <= decoded[start + i] < 127 or decoded[start + i] == 0
-               for i in range(min(10, len(decoded) - start))):
-            name_chars = []
-            for i in range(min(12, len(decoded) - start)):
-                b = decoded[start + i]
-                if b == 0:
-                    break
-                if 32 <= b < 127:
-                    name_chars.append(chr(b))
-            if len(name_chars) >= 3:  # Found a name
-                patch.patch_name = ''.join(name_chars).strip()
+        if not decoded[start:start + 10].translate(None, _NAME_WINDOW_BYTES):
+            # Name runs up to the first NUL; non-printable bytes are dropped
+            name_bytes = decoded[start:start + 12].split(b'\x00', 1)[0]
+            name_bytes = name_bytes.translate(None, _NON_PRINTABLE)
+            if len(name_bytes) >= 3:  # Found a name
+                patch.patch_name = name_bytes.decode('ascii').strip()
                 patch._name_offset = start
                 break
 
@@ -236,24 +277,26 @@ def parse_patch_data(data: List[int]) -> Optional[PatchData]:
     # Each slot is 12 bytes. On/off status is bit 0 of first byte.
     # Slot offsets in decoded data: 0, 12, 24, 36, 48, 60
 
-    SLOT_SIZE = 12
-    for slot_num in range(NUM_EFFECT_SLOTS):
-        slot = EffectSlot(slot_num=slot_num)
-
-        slot_start = slot_num * SLOT_SIZE
-        slot_end = slot_start + SLOT_SIZE
+    # Only slots that fit entirely in the decoded data are parsed; any
+    # remaining slots are left empty
+    num_parsed = min(NUM_EFFECT_SLOTS, len(decoded) // DECODED_SLOT_SIZE)
 
-        if slot_end <= len(decoded):
-            slot.raw_bytes = bytes(decoded[slot_start:slot_end])
-
-            # On/off status: bit 0 of first byte in slot
-            slot.enabled = bool(decoded[slot_start] & 0x01)
+    # First byte of every parsed slot, gathered with one strided slice
+    first_bytes = decoded[:num_parsed * DECODED_SLOT_SIZE:DECODED_SLOT_SIZE]
 
+    for (slot_num, slot_start, slot_end), first_byte in zip(_SLOT_TABLE, first_bytes):
+        patch.effect_slots.append(EffectSlot(
+            slot_num=slot_num,
             # Effect ID: still needs investigation, but store first byte (minus enable bit)
             # for reference
-            slot.effect_id = decoded[slot_start] & 0xFE  # Mask off the enable bit
+            effect_id=first_byte & 0xFE,
+            # On/off status: bit 0 of first byte in slot
+            enabled=bool(first_byte & 0x01),
+            raw_bytes=decoded[slot_start:slot_end],
+        ))
 
-        patch.effect_slots.append(slot)
+    for slot_num, _, _ in _SLOT_TABLE[num_parsed:]:
+        patch.effect_slots.append(EffectSlot(slot_num=slot_num))
 
     return patch
 
@@ -262,69 +305,135 @@ def print_patch_info(patch: PatchData, verbose: bool = False):
     """
     Print human-readable patch information.
 
+    The report is assembled as a list of lines and written to stdout in one go.
+
     Args:
         patch: Parsed PatchData object
         verbose: If True, show full hex dump
     """
-    print("\n" + "=" * 60)
-    print(f"PATCH: {patch.patch_name or '(unnamed)'}")
-    print("=" * 60)
-
-    print("\nEFFECT SLOTS:")
-    print("-" * 60)
+    lines = [
+        "",
+        "=" * 60,
+        f"PATCH: {patch.patch_name or '(unnamed)'}",
+        "=" * 60,
+        "",
+        "EFFECT SLOTS:",
+        "-" * 60,
+    ]
 
     for slot in patch.effect_slots:
         status = "ON " if slot.enabled else "OFF"
         # First byte (with enable bit masked) might indicate effect category
         first_byte = slot.raw_bytes[0] if slot.raw_bytes else 0
-        print(f"  Slot {slot.slot_num}: [{status}]  (byte0=0x{first_byte:02X})")
+        lines.append(f"  Slot {slot.slot_num}: [{status}]  (byte0=0x{first_byte:02X})")
 
-    print("-" * 60)
+    lines.append("-" * 60)
 
     if verbose:
-        print(f"\nRaw bytes: {len(patch.raw_data)}, Decoded bytes: {len(patch.decoded_data)}")
+        lines.append(f"\nRaw bytes: {len(patch.raw_data)}, Decoded bytes: {len(patch.decoded_data)}")
 
         # Show full decoded data in rows of 16 for analysis
-        print("\nDECODED DATA (hex dump):")
-        print("-" * 60)
+        lines.append("\nDECODED DATA (hex dump):")
+        lines.append("-" * 60)
         decoded = patch.decoded_data
         for row_start in range(0, len(decoded), 16):
             row = decoded[row_start:row_start + 16]
-            hex_part = ' '.join(f'{b:02X}' for b in row)
-            ascii_part = ''.join(chr(b) if 32 <= b < 127 else '.' for b in row)
-            print(f"  {row_start:04X}: {hex_part:<48s} |{ascii_part}|")
+            hex_part = row.hex(' ').upper()
+            ascii_part = row.translate(_ASCII_PREVIEW).decode('ascii')
+            lines.append(f"  {row_start:04X}: {hex_part:<48s} |{ascii_part}|")
+
+        lines.append("-" * 60)
+
+    lines.append("")
+    sys.stdout.write('\n'.join(lines))
+
+
+def find_g3x_port() -> Optional[str]:
+    """
+    Try to find the G3X MIDI output port automatically.
+
+    A found port is cached, since enumerating ports is slow on some backends;
+    a failed search is not, so a pedal plugged in later is still found. Call
+    clear_g3x_port_cache() to look again.
+
+    Returns:
+        Port name, or None if no G3X was found
+    """
+    global _found_port
+
+    # G3X_PORT skips port enumeration entirely (e.g. for scripted use); it is
+    # read on every call so changes take effect immediately
+    env_port = os.environ.get('G3X_PORT')
+    if env_port:
+        return env_port
+
+    if _found_port is None:
+        import mido
+
+        for port in mido.get_output_names():
+            # Look for common Zoom identifiers
+            name = port.lower()
+            if any(marker in name for marker in _G3X_PORT_MARKERS):
+                _found_port = port
+                break
+    return _found_port
+
+
+def clear_g3x_port_cache():
+    """Forget the cached port so the next find_g3x_port() searches again."""
+    global _found_port
+    _found_port = None
+
+
+def open_matching_input(port_name: str) -> Optional[mido.ports.BaseInput]:
+    """
+    Open the input port that belongs to the same device as an output port.
+
+    Ports are matched on the part of the name before the first ':'.
+
+    Args:
+        port_name: Name of the device's output port
+
+    Returns:
+        Opened input port, or None if no matching input was found
+    """
+    import mido
+
+    prefix = port_name.split(':', 1)[0]
+    inputs = mido.get_input_names()
+    return next((mido.open_input(inp) for inp in inputs if prefix in inp), None)
 
-        print("-" * 60)
 
 class ZoomG3X:
     """Interface for the Zoom G3X multi-effects pedal."""
 
-    def __init__(self, port_name: Optional[str] = None):
+    def __init__(self, port_name: Optional[str] = None, debug: bool = False):
         """
         Initialize connection to the G3X.
 
         Args:
             port_name: MIDI port name. If None, will attempt to auto-detect.
+            debug: If True, print every transmitted SysEx message.
         """
         self.port_name = port_name
         self.port: Optional[mido.ports.BaseOutput] = None
         self.input_port: Optional[mido.ports.BaseInput] = None
         self.in_edit_mode = False
+        self._debug = debug
+        self._tx_buf = bytearray(SYSEX_PREFIX)  # Reused for every transmit
+        self._knob_templates = {}  # (slot, knob) -> full knob SysEx message
 
     def list_ports(self) -> tuple[List[str], List[str]]:
         """List available MIDI ports."""
+        import mido
+
         inputs = mido.get_input_names()
         outputs = mido.get_output_names()
         return inputs, outputs
 
     def find_g3x_port(self) -> Optional[str]:
         """Try to find the G3X MIDI port automatically."""
-        outputs = mido.get_output_names()
-        for port in outputs:
-            # Look for common Zoom identifiers
-            if 'zoom' in port.lower() or 'g3x' in port.lower():
-                return port
-        return None
+        return find_g3x_port()
 
     def connect(self) -> bool:
         """
@@ -333,7 +442,10 @@ class ZoomG3X:
         Returns:
             True if connection successful.
         """
-        if self.port_name is None:
+        import mido
+
+        auto_detected = self.port_name is None
+        if auto_detected:
             self.port_name = self.find_g3x_port()
 
         if self.port_name is None:
@@ -346,15 +458,15 @@ class ZoomG3X:
         try:
             self.port = mido.open_output(self.port_name)
             # Try to open matching input port for responses
-            inputs = mido.get_input_names()
-            for inp in inputs:
-                if self.port_name.split(':')[0] in inp:
-                    self.input_port = mido.open_input(inp)
-                    break
+            self.input_port = open_matching_input(self.port_name)
             print(f"Connected to: {self.port_name}")
             return True
         except Exception as e:
             print(f"Failed to connect: {e}")
+            if auto_detected:
+                # The cached port may be stale; search again next time
+                self.port_name = None
+                clear_g3x_port_cache()
             return False
 
     def disconnect(self):
@@ -367,8 +479,10 @@ class ZoomG3X:
         if self.input_port:
             self.input_port.close()
             self.input_port = None
+        # The device may be on a different port next time
+        clear_g3x_port_cache()
 
-    def _send_sysex(self, data: List[int]) -> Optional[List[int]]:
+    def _send_sysex(self, data: bytes) -> Optional[bytes]:
         """
         Send a SysEx message and optionally receive response.
 
@@ -378,30 +492,66 @@ class ZoomG3X:
         Returns:
             Response data if input port available, else None
         """
+        # Build full SysEx: prefix + data
+        del self._tx_buf[len(SYSEX_PREFIX):]
+        self._tx_buf.extend(data)
+        return self._send_full_sysex(self._tx_buf)
+
+    def _send_full_sysex(self, full_msg: bytes) -> Optional[bytes]:
+        """
+        Send a complete SysEx message and optionally receive response.
+
+        Args:
+            full_msg: SysEx bytes including SYSEX_PREFIX (without F0/F7)
+
+        Returns:
+            Response data if input port available, else None. For requests
+            listed in _REPLY_CMDS only a reply with the matching command byte
+            is returned; anything else the pedal sends meanwhile (such as
+            parameter changes from turning a knob in edit mode) is skipped.
+        """
+        import mido
+
         if not self.port:
             print("Not connected!")
             return None
 
-        # Build full SysEx: prefix + data
-        full_msg = SYSEX_PREFIX + data
         msg = mido.Message('sysex', data=full_msg)
 
-        print(f"TX: F0 {' '.join(f'{b:02X}' for b in full_msg)} F7")
+        reply_cmd = _REPLY_CMDS.get(full_msg[3]) if len(full_msg) > 3 else None
+        if self.input_port:
+            # Drop unprompted messages and late replies to earlier commands
+            for _ in self.input_port.iter_pending():
+                pass
+
+        if self._debug:
+            print(f"TX: F0 {full_msg.hex(' ').upper()} F7")
         self.port.send(msg)
 
-        # Try to read response
+        # Wait for the response, returning as soon as it arrives
         if self.input_port:
-            time.sleep(0.1)  # Give device time to respond
-            response = []
-            for msg in self.input_port.iter_pending():
-                if msg.type == 'sysex':
-                    response = list(msg.data)
-                    print(f"RX: F0 {' '.join(f'{b:02X}' for b in response)} F7")
-            return response if response else None
+            timeout = _RX_TIMEOUT if reply_cmd is not None else _RX_TIMEOUT_NO_REPLY
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                msg = self.input_port.poll()
+                if msg is None:
+                    time.sleep(_RX_POLL)
+                elif msg.type == 'sysex':
+                    response = bytes(msg.data)
+                    if reply_cmd is not None and not (
+                            response.startswith(SYSEX_PREFIX)
+                            and len(response) > 3 and response[3] == reply_cmd):
+                        if self._debug:
+                            print(f"RX (skipped): F0 {response.hex(' ').upper()} F7")
+                        continue
+                    print(f"RX: F0 {response.hex(' ').upper()} F7")
+                    return response
         return None
 
     def _send_program_change(self, program: int):
         """Send a program change message."""
+        import mido
+
         if not self.port:
             print("Not connected!")
             return
@@ -431,7 +581,7 @@ class ZoomG3X:
     # Patch Operations
     # =========================================================================
 
-    def get_current_patch_data(self) -> Optional[List[int]]:
+    def get_current_patch_data(self) -> Optional[bytes]:
         """Get full data for the current patch."""
         return self._send_sysex([CMD_GET_PATCH_DATA])
 
@@ -523,12 +673,132 @@ class ZoomG3X:
             print(f"Invalid slot: {slot} (must be 0-5)")
             return
 
-        # Knob command is 0x02 + (knob - 1), or just knob + 1 based on docs
-        knob_cmd = knob + 0x01
-        self._send_sysex([CMD_MODIFY_EFFECT, slot, 0x00, knob_cmd, value, 0x00])
+        # Messages are built once per (slot, knob); later calls only patch
+        # the value byte, which keeps live knob sweeps cheap
+        template = self._knob_templates.get((slot, knob))
+        if template is None:
+            # Knob command is 0x02 + (knob - 1), or just knob + 1 based on docs
+            knob_cmd = knob + 0x01
+            template = bytearray(SYSEX_PREFIX)
+            template.extend([CMD_MODIFY_EFFECT, slot, 0x00, knob_cmd, 0x00, 0x00])
+            self._knob_templates[(slot, knob)] = template
+
+        template[-2] = value
+        self._send_full_sysex(template)
         print(f"Slot {slot}, Knob {knob}: Set to {value}")
 
 
+# =============================================================================
+# Interactive Mode
+# =============================================================================
+
+def _int_cmd(method_name: str, num_args: int, *extra_args):
+    """
+    Build a command table entry that calls a ZoomG3X method with int arguments.
+
+    Args:
+        method_name: ZoomG3X method to call
+        num_args: Number of int arguments taken from the command line
+        extra_args: Fixed arguments appended after the parsed ints
+
+    Returns:
+        (handler, num_args) tuple for _COMMANDS
+    """
+    def handler(g3x: ZoomG3X, args: List[str]):
+        getattr(g3x, method_name)(*(int(a) for a in args[:num_args]), *extra_args)
+    return handler, num_args
+
+
+def _cmd_data(g3x: ZoomG3X, args: List[str]):
+    """Fetch and cache the current patch data."""
+    response = g3x.get_current_patch_data()
+    if response:
+        g3x._last_patch_data = response
+        print(f"Received {len(response)} bytes (use 'parse' to decode)")
+
+
+def _cmd_info(g3x: ZoomG3X, args: List[str]):
+    """Fetch, parse and print the current patch."""
+    verbose = len(args) > 0 and args[0].lower() == '-v'
+    patch = g3x.get_patch_info()
+    if patch:
+        g3x._last_patch_data = patch.raw_data
+        g3x._last_patch = patch
+        print_patch_info(patch, verbose=verbose)
+    else:
+        print("Failed to get patch info (are you in edit mode?)")
+
+
+def _cmd_dump(g3x: ZoomG3X, args: List[str]):
+    """Show raw vs decoded hex for the cached patch."""
+    if hasattr(g3x, '_last_patch') and g3x._last_patch:
+        patch = g3x._last_patch
+        raw_payload = patch.raw_data[4:]  # Skip header
+        decoded = patch.decoded_data
+
+        print(f"\nPatch: {patch.patch_name}")
+        print(f"Raw payload: {len(raw_payload)} bytes")
+        print(f"Decoded: {len(decoded)} bytes")
+
+        print("\n" + "=" * 70)
+        print("RAW PAYLOAD:")
+        print("-" * 70)
+        for row_start in range(0, len(raw_payload), 16):
+            row = raw_payload[row_start:row_start + 16]
+            hex_part = row.hex(' ').upper()
+            ascii_part = row.translate(_ASCII_PREVIEW).decode('ascii')
+            print(f"  {row_start:04X}: {hex_part:<48s} |{ascii_part}|")
+
+        print("\n" + "=" * 70)
+        print("DECODED DATA:")
+        print("-" * 70)
+        for row_start in range(0, len(decoded), 16):
+            row = decoded[row_start:row_start + 16]
+            hex_part = row.hex(' ').upper()
+            ascii_part = row.translate(_ASCII_PREVIEW).decode('ascii')
+            print(f"  {row_start:04X}: {hex_part:<48s} |{ascii_part}|")
+    else:
+        print("No patch data cached. Run 'info' first.")
+
+
+def _cmd_ports(g3x: ZoomG3X, args: List[str]):
+    """List MIDI ports."""
+    inputs, outputs = g3x.list_ports()
+    print(f"Inputs:  {inputs}")
+    print(f"Outputs: {outputs}")
+
+
+def _cmd_raw(g3x: ZoomG3X, args: List[str]):
+    """Send raw hex bytes (for experimentation)."""
+    # Tokens may be written as "5", "05" or "0x05", one byte each; once every
+    # token is checked, the whole line is parsed with one bytes.fromhex() call
+    tokens = []
+    for arg in args:
+        token = arg[2:] if arg[:2].lower() == '0x' else arg
+        if not 1 <= len(token) <= 2 or token.strip(string.hexdigits):
+            raise ValueError(f"not a hex byte: {arg!r}")
+        tokens.append(token.zfill(2))
+    data = bytes.fromhex(''.join(tokens))
+    g3x._send_sysex(data)
+
+
+# Command name -> (handler(g3x, args), minimum number of arguments)
+_COMMANDS = {
+    'edit': (lambda g3x, args: g3x.enter_edit_mode(), 0),
+    'normal': (lambda g3x, args: g3x.exit_edit_mode(), 0),
+    'patch': _int_cmd('change_patch', 1),
+    'data': (_cmd_data, 0),
+    'info': (_cmd_info, 0),
+    'dump': (_cmd_dump, 0),
+    'prog': (lambda g3x, args: g3x.get_current_program(), 0),
+    'on': _int_cmd('set_effect_enabled', 1, True),
+    'off': _int_cmd('set_effect_enabled', 1, False),
+    'knob': _int_cmd('set_knob_value', 3),
+    'ports': (_cmd_ports, 0),
+    'raw': (_cmd_raw, 1),
+}
+
+
 def interactive_mode(g3x: ZoomG3X):
     """Simple interactive command interface."""
     print("\n=== Zoom G3X Interactive Mode ===")
@@ -550,77 +820,17 @@ def interactive_mode(g3x: ZoomG3X):
 
     while True:
         try:
-            cmd = input("g3x> ").strip().lower().split()
+            cmd = input("g3x> ").split()
             if not cmd:
                 continue
 
-            if cmd[0] == 'quit' or cmd[0] == 'q':
+            name = cmd[0].lower()
+            if name == 'quit' or name == 'q':
                 break
-            elif cmd[0] == 'edit':
-                g3x.enter_edit_mode()
-            elif cmd[0] == 'normal':
-                g3x.exit_edit_mode()
-            elif cmd[0] == 'patch' and len(cmd) > 1:
-                g3x.change_patch(int(cmd[1]))
-            elif cmd[0] == 'data':
-                response = g3x.get_current_patch_data()
-                if response:
-                    g3x._last_patch_data = response
-                    print(f"Received {len(response)} bytes (use 'parse' to decode)")
-            elif cmd[0] == 'info':
-                verbose = len(cmd) > 1 and cmd[1] == '-v'
-                patch = g3x.get_patch_info()
-                if patch:
-                    g3x._last_patch_data = list(patch.raw_data)
-                    g3x._last_patch = patch
-                    print_patch_info(patch, verbose=verbose)
-                else:
-                    print("Failed to get patch info (are you in edit mode?)")
-            elif cmd[0] == 'dump':
-                if hasattr(g3x, '_last_patch') and g3x._last_patch:
-                    patch = g3x._last_patch
-                    raw_payload = list(patch.raw_data)[4:]  # Skip header
-                    decoded = list(patch.decoded_data)
-
-                    print(f"\nPatch: {patch.patch_name}")
-                    print(f"Raw payload: {len(raw_payload)} bytes")
-                    print(f"Decoded: {len(decoded)} bytes")
-
-                    print("\n" + "=" * 70)
-                    print("RAW PAYLOAD:")
-                    print("-" * 70)
-                    for row_start in range(0, len(raw_payload), 16):
-                        row = raw_payload[row_start:row_start + 16]
-                        hex_part = ' '.join(f'{b:02X}' for b in row)
-                        ascii_part = ''.join(chr(b) if 32 <= b < 127 else '.' for b in row)
-                        print(f"  {row_start:04X}: {hex_part:<48s} |{ascii_part}|")
-
-                    print("\n" + "=" * 70)
-                    print("DECODED DATA:")
-                    print("-" * 70)
-                    for row_start in range(0, len(decoded), 16):
-                        row = decoded[row_start:row_start + 16]
-                        hex_part = ' '.join(f'{b:02X}' for b in row)
-                        ascii_part = ''.join(chr(b) if 32 <= b < 127 else '.' for b in row)
-                        print(f"  {row_start:04X}: {hex_part:<48s} |{ascii_part}|")
-                else:
-                    print("No patch data cached. Run 'info' first.")
-            elif cmd[0] == 'prog':
-                g3x.get_current_program()
-            elif cmd[0] == 'on' and len(cmd) > 1:
-                g3x.set_effect_enabled(int(cmd[1]), True)
-            elif cmd[0] == 'off' and len(cmd) > 1:
-                g3x.set_effect_enabled(int(cmd[1]), False)
-            elif cmd[0] == 'knob' and len(cmd) > 3:
-                g3x.set_knob_value(int(cmd[1]), int(cmd[2]), int(cmd[3]))
-            elif cmd[0] == 'ports':
-                inputs, outputs = g3x.list_ports()
-                print(f"Inputs:  {inputs}")
-                print(f"Outputs: {outputs}")
-            elif cmd[0] == 'raw' and len(cmd) > 1:
-                # Send raw hex bytes (for experimentation)
-                data = [int(x, 16) for x in cmd[1:]]
-                g3x._send_sysex(data)
+
+            handler, min_args = _COMMANDS.get(name, (None, 0))
+            if handler and len(cmd) > min_args:
+                handler(g3x, cmd[1:])
             else:
                 print(f"Unknown command: {' '.join(cmd)}")
 
@@ -636,12 +846,14 @@ def main():
     import argparse
 
     parser = argparse.ArgumentParser(description='Zoom G3X MIDI Controller')
-    parser.add_argument('-p', '--port', help='MIDI port name (auto-detect if not specified)')
+    parser.add_argument('-p', '--port',
+                        help='MIDI port name (default: $G3X_PORT, else auto-detect)')
     parser.add_argument('-l', '--list', action='store_true', help='List MIDI ports and exit')
     parser.add_argument('--patch', type=int, help='Switch to patch number and exit')
+    parser.add_argument('-d', '--debug', action='store_true', help='Print transmitted SysEx messages')
     args = parser.parse_args()
 
-    g3x = ZoomG3X(port_name=args.port)
+    g3x = ZoomG3X(port_name=args.port, debug=args.debug)
 
     if args.list:
         inputs, outputs = g3x.list_ports()
@@ -9,22 +9,17 @@ Press Ctrl+C to exit.
 """
 
 import mido
+import queue
 import time
 import sys
 from datetime import datetime
-from g3x_midi import SYSEX_PREFIX, decode_overflow_bytes
+from g3x_midi import SYSEX_PREFIX, decode_overflow_bytes, find_g3x_port, open_matching_input
 
-
-def find_g3x_port():
-    outputs = mido.get_output_names()
-    for port in outputs:
-        if 'zoom' in port.lower() or 'g3x' in port.lower():
-            return port
-    return None
+LOG_FLUSH_INTERVAL = 0.2  # Seconds between changes.log flushes
 
 
 def format_hex(data):
-    return ' '.join(f'{b:02X}' for b in data)
+    return bytes(data).hex(' ').upper()
 
 
 def main():
@@ -34,11 +29,7 @@ def main():
         sys.exit(1)
 
     output_port = mido.open_output(port_name)
-    input_port = None
-    for inp in mido.get_input_names():
-        if port_name.split(':')[0] in inp:
-            input_port = mido.open_input(inp)
-            break
+    input_port = open_matching_input(port_name)
 
     if not input_port:
         print("Could not find input port")
@@ -46,12 +37,12 @@ def main():
 
     print(f"Connected to: {port_name}")
 
-    log_file = open('changes.log', 'w')
+    log_file = open('changes.log', 'w', buffering=1 << 16)
     log_file.write(f"G3X Change Listener - {datetime.now().isoformat()}\n\n")
 
     # Enter edit mode
     print("Entering edit mode...")
-    output_port.send(mido.Message('sysex', data=SYSEX_PREFIX + [0x50]))
+    output_port.send(mido.Message('sysex', data=SYSEX_PREFIX + b'\x50'))
     time.sleep(0.2)
 
     # Drain any pending messages
@@ -65,74 +56,89 @@ def main():
     print("Messages will appear here. Press Ctrl+C to exit.\n")
 
     msg_count = 0
+    # Log records from the MIDI callback thread; the main thread writes them
+    log_queue = queue.SimpleQueue()
+
+    def handle_message(msg):
+        """Print a message and queue its log record (runs on the MIDI thread)."""
+        nonlocal msg_count
+        msg_count += 1
+        timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+
+        if msg.type == 'sysex':
+            data = bytes(msg.data)
+            hex_str = format_hex(data)
+
+            # Check if it's a G3X message
+            if data.startswith(SYSEX_PREFIX):
+                cmd = data[3]
+                payload = data[4:]
+                # Decode once and reuse it for both console and log output
+                decoded = decode_overflow_bytes(payload) if len(payload) >= 8 else None
+
+                print(f"[{timestamp}] #{msg_count} SysEx cmd=0x{cmd:02X} ({len(data)} bytes)")
+
+                # For short messages, show full data
+                if len(payload) <= 16:
+                    print(f"  Payload: {format_hex(payload)}")
+
+                    # Try to decode if long enough
+                    if decoded is not None:
+                        print(f"  Decoded: {format_hex(decoded)}")
+                else:
+                    # For patch data, show summary
+                    print(f"  Payload: {len(payload)} bytes, Decoded: {len(decoded)} bytes")
+                    print(f"  First 32 decoded: {format_hex(decoded[:32])}")
+
+                parts = [f"[{timestamp}] SysEx cmd=0x{cmd:02X}\n",
+                         f"  Raw: F0 {hex_str} F7\n"]
+                if decoded is not None:
+                    parts.append(f"  Decoded: {format_hex(decoded)}\n")
+                parts.append("\n")
+                log_queue.put(''.join(parts))
+            else:
+                print(f"[{timestamp}] #{msg_count} Unknown SysEx: {hex_str[:60]}...")
+                log_queue.put(f"[{timestamp}] Unknown: {hex_str}\n\n")
+
+            print()
+
+        elif msg.type == 'control_change':
+            print(f"[{timestamp}] #{msg_count} CC: ch={msg.channel} ctrl={msg.control} val={msg.value}")
+            log_queue.put(f"[{timestamp}] CC: ch={msg.channel} ctrl={msg.control} val={msg.value}\n")
+
+        elif msg.type == 'program_change':
+            print(f"[{timestamp}] #{msg_count} Program Change: {msg.program}")
+            log_queue.put(f"[{timestamp}] Program Change: {msg.program}\n")
+
+        else:
+            print(f"[{timestamp}] #{msg_count} {msg.type}: {msg}")
+            log_queue.put(f"[{timestamp}] {msg.type}: {msg}\n")
+
+    # Messages are now delivered straight from the MIDI backend's thread
+    input_port.callback = handle_message
+    last_flush = time.monotonic()
 
     try:
+        # Write queued records, flushing on a timer rather than per message
         while True:
-            for msg in input_port.iter_pending():
-                msg_count += 1
-                timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-
-                if msg.type == 'sysex':
-                    data = list(msg.data)
-                    hex_str = format_hex(data)
-
-                    # Check if it's a G3X message
-                    if data[0:3] == SYSEX_PREFIX:
-                        cmd = data[3]
-                        payload = data[4:]
-
-                        print(f"[{timestamp}] #{msg_count} SysEx cmd=0x{cmd:02X} ({len(data)} bytes)")
-
-                        # For short messages, show full data
-                        if len(payload) <= 16:
-                            print(f"  Payload: {format_hex(payload)}")
-
-                            # Try to decode if long enough
-                            if len(payload) >= 8:
-                                decoded = decode_overflow_bytes(payload)
-                                print(f"  Decoded: {format_hex(decoded)}")
-                        else:
-                            # For patch data, show summary
-                            decoded = decode_overflow_bytes(payload)
-                            print(f"  Payload: {len(payload)} bytes, Decoded: {len(decoded)} bytes")
-                            print(f"  First 32 decoded: {format_hex(decoded[:32])}")
-
-                        log_file.write(f"[{timestamp}] SysEx cmd=0x{cmd:02X}\n")
-                        log_file.write(f"  Raw: F0 {hex_str} F7\n")
-                        if len(payload) >= 8:
-                            decoded = decode_overflow_bytes(payload)
-                            log_file.write(f"  Decoded: {format_hex(decoded)}\n")
-                        log_file.write("\n")
-                    else:
-                        print(f"[{timestamp}] #{msg_count} Unknown SysEx: {hex_str[:60]}...")
-                        log_file.write(f"[{timestamp}] Unknown: {hex_str}\n\n")
-
-                    print()
-                    log_file.flush()
-
-                elif msg.type == 'control_change':
-                    print(f"[{timestamp}] #{msg_count} CC: ch={msg.channel} ctrl={msg.control} val={msg.value}")
-                    log_file.write(f"[{timestamp}] CC: ch={msg.channel} ctrl={msg.control} val={msg.value}\n")
-                    log_file.flush()
-
-                elif msg.type == 'program_change':
-                    print(f"[{timestamp}] #{msg_count} Program Change: {msg.program}")
-                    log_file.write(f"[{timestamp}] Program Change: {msg.program}\n")
-                    log_file.flush()
-
-                else:
-                    print(f"[{timestamp}] #{msg_count} {msg.type}: {msg}")
-                    log_file.write(f"[{timestamp}] {msg.type}: {msg}\n")
-                    log_file.flush()
-
-            time.sleep(0.01)
+            try:
+                log_file.write(log_queue.get(timeout=LOG_FLUSH_INTERVAL))
+            except queue.Empty:
+                pass
+            now = time.monotonic()
+            if now - last_flush > LOG_FLUSH_INTERVAL:
+                log_file.flush()
+                last_flush = now
 
     except KeyboardInterrupt:
         print(f"\n\nReceived {msg_count} messages. Log saved to changes.log")
 
     finally:
+        input_port.callback = None
+        while not log_queue.empty():
+            log_file.write(log_queue.get())
         print("Exiting edit mode...")
-        output_port.send(mido.Message('sysex', data=SYSEX_PREFIX + [0x51]))
+        output_port.send(mido.Message('sysex', data=SYSEX_PREFIX + b'\x51'))
         output_port.close()
         input_port.close()
         log_file.close()
@@ -5,163 +5,391 @@ G3X Command Scanner
 Scans all possible SysEx commands (0x00-0x7F) and logs responses.
 Helps discover undocumented commands and find effect on/off status.
 
+With --mode params, every command that responded is then sent again with
+each slot parameter (0-5) to find per-slot queries. Commands that did not
+respond to the plain scan are not swept; use --mode full to sweep every
+command in the range, including ones that only answer when given a slot.
+
 Usage:
-    python scan_commands.py [-p PORT] [-o OUTPUT_FILE]
+    python scan_commands.py [-p PORT] [-o OUTPUT_FILE] [--mode quick|params|full]
 """
 
 import mido
+import queue
 import time
 import sys
 import argparse
+import io
+import re
+import statistics
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-
-SYSEX_PREFIX = [0x52, 0x00, 0x59]
-
-
-def find_g3x_port():
-    """Try to find the G3X MIDI port automatically."""
-    outputs = mido.get_output_names()
-    for port in outputs:
-        if 'zoom' in port.lower() or 'g3x' in port.lower():
-            return port
-    return None
-
-
-def send_sysex(output_port, input_port, data, timeout=0.15):
-    """Send SysEx and capture response."""
-    full_msg = SYSEX_PREFIX + data
-    msg = mido.Message('sysex', data=full_msg)
-    output_port.send(msg)
-
-    time.sleep(timeout)
-
-    responses = []
-    for msg in input_port.iter_pending():
-        if msg.type == 'sysex':
-            responses.append(list(msg.data))
-
-    return responses
+from g3x_midi import SYSEX_PREFIX, find_g3x_port, open_matching_input
+
+NUM_SLOTS = 6
+RESPONSE_IDLE = 0.005  # Stop collecting after this long without a message
+DEFAULT_TIMEOUT = 0.15  # Wait for a first reply until the latency is known
+MIN_TIMEOUT = 0.01  # Adaptive-timeout floor for commands that have answered
+# Commands not yet seen to answer keep the full pre-adaptation wait, so a
+# slow first reply still counts toward the quick scan's responders
+MIN_UNANSWERED_TIMEOUT = DEFAULT_TIMEOUT
+LATENCY_SAMPLES = 10  # Replies measured before the timeout adapts
+BANNER = '=' * 70  # Section separator for console and log output
+CONSOLE_FLUSH_EVERY = 64  # Write compact sweep output every N commands
+
+# analyze_response: possible on/off flag bytes (0x00/0x01) translate to 0x00,
+# everything else to 0xFF, so flag windows become runs of NULs
+_FLAG_TABLE = bytes(0x00 if b in (0, 1) else 0xFF for b in range(256))
+_FLAG_RUN_RE = re.compile(rb'\x00{6,}')
+_ASCII_RUN_RE = re.compile(rb'[\x20-\x7e]{4,}')
 
 
 def format_hex(data):
     """Format bytes as hex string."""
-    return ' '.join(f'{b:02X}' for b in data)
+    return bytes(data).hex(' ').upper()
+
+
+# SysEx prefix as it appears on every TX log line
+_PREFIX_HEX = format_hex(SYSEX_PREFIX)
 
 
 def analyze_response(cmd, response):
-    """Look for interesting patterns in response."""
+    """Look for interesting patterns in a response (bytes, without F0/F7)."""
     notes = []
 
-    if not response:
+    # Too short for a command byte, a flag window or an ASCII run
+    if len(response) < 4:
         return notes
 
     # Check response command byte (usually at index 3)
-    if len(response) > 3:
-        resp_cmd = response[3]
-        # Response is often request command - 1
-        if resp_cmd == cmd - 1:
-            notes.append(f"resp_cmd=0x{resp_cmd:02X} (req-1)")
-        elif resp_cmd == cmd:
-            notes.append(f"resp_cmd=0x{resp_cmd:02X} (echo)")
-        else:
-            notes.append(f"resp_cmd=0x{resp_cmd:02X}")
+    resp_cmd = response[3]
+    # Response is often request command - 1
+    if resp_cmd == cmd - 1:
+        notes.append(f"resp_cmd=0x{resp_cmd:02X} (req-1)")
+    elif resp_cmd == cmd:
+        notes.append(f"resp_cmd=0x{resp_cmd:02X} (echo)")
+    else:
+        notes.append(f"resp_cmd=0x{resp_cmd:02X}")
 
     # Look for sequences that might be on/off flags (6 consecutive 0x00/0x01)
-    for i in range(len(response) - 5):
-        window = response[i:i+6]
-        if all(b in [0, 1] for b in window):
-            notes.append(f"possible flags @{i}: {window}")
-
-    # Check for ASCII text
-    ascii_chars = []
-    for i, b in enumerate(response):
-        if 32 <= b < 127:
-            ascii_chars.append((i, chr(b)))
-    if len(ascii_chars) >= 4:
-        # Find consecutive ASCII runs
-        runs = []
-        current_run = []
-        last_i = -2
-        for i, c in ascii_chars:
-            if i == last_i + 1:
-                current_run.append(c)
-            else:
-                if len(current_run) >= 4:
-                    runs.append(''.join(current_run))
-                current_run = [c]
-            last_i = i
-        if len(current_run) >= 4:
-            runs.append(''.join(current_run))
-        if runs:
-            notes.append(f"ASCII: {runs}")
-
-    return notes
+    flags = response.translate(_FLAG_TABLE)
+    for run in _FLAG_RUN_RE.finditer(flags):
+        # Report every 6-byte window inside the run, as a sliding scan would
+        for i in range(run.start(), run.end() - 5):
+            notes.append(f"possible flags @{i}: {list(response[i:i+6])}")
 
+    # Check for ASCII text (runs of 4+ printable characters)
+    runs = [run.decode('ascii') for run in _ASCII_RUN_RE.findall(response)]
+    if runs:
+        notes.append(f"ASCII: {runs}")
 
-def scan_commands(output_port, input_port, log_file, start=0x00, end=0x7F):
-    """Scan all commands and log responses."""
+    return notes
 
-    print(f"\nScanning commands 0x{start:02X} to 0x{end:02X}...")
-    print("=" * 70)
 
-    results = []
+class G3XScanner:
+    """Sends scan commands to the G3X and logs the responses."""
+
+    def __init__(self, output_port, input_port, log_file):
+        """
+        Args:
+            output_port: Open mido output port
+            input_port: Open mido input port for the same device
+            log_file: Unbuffered binary file that scan results are written to;
+                each command's output is encoded and written in one call
+        """
+        self.output_port = output_port
+        self.input_port = input_port
+        self.log_file = log_file
+
+        # Incoming SysEx payloads are pushed onto a queue as soon as they
+        # arrive, with their arrival time
+        self._rx_queue = queue.SimpleQueue()
+        input_port.callback = self._on_msg
+
+        # Time to first reply, adapted from the device's measured latency
+        self.timeout = DEFAULT_TIMEOUT
+        self._latencies = deque(maxlen=50)
+        # Slowest first-reply latency seen per command byte; later sends of
+        # that command wait at least twice as long
+        self._slowest = {}
+
+        # Last message sent and when, for attributing late replies
+        self._last_tx = None
+        self._last_sent_at = None
+
+        # Log formatting, response analysis and console output run on a
+        # single worker thread so they overlap the wait for the next reply
+        self._worker = ThreadPoolExecutor(max_workers=1)
+        self._pending = deque()
+        self._console = []  # Compact sweep output waiting to be written
+
+    def send_sysex(self, data, timeout=None):
+        """
+        Send SysEx and capture response.
+
+        Waits up to `timeout` seconds for the first reply, then keeps
+        collecting until no message has arrived for RESPONSE_IDLE seconds.
+        The default is self.timeout, raised to twice the command's slowest
+        reply so far, or to MIN_UNANSWERED_TIMEOUT if it has never replied.
+        Replies still queued from the previous message are logged as late
+        replies to it rather than returned.
+        """
+        tx = SYSEX_PREFIX + bytes(data)
+        if timeout is None:
+            slowest = self._slowest.get(tx[3])
+            if slowest is None:
+                timeout = max(self.timeout, MIN_UNANSWERED_TIMEOUT)
+            else:
+                timeout = max(self.timeout, 2 * slowest)
 
-    for cmd in range(start, end + 1):
-        # Send simple command (just the command byte)
-        responses = send_sysex(output_port, input_port, [cmd])
+        self._collect_late_replies()
 
-        result = {
-            'cmd': cmd,
-            'tx': SYSEX_PREFIX + [cmd],
-            'responses': responses
-        }
-        results.append(result)
+        msg = mido.Message('sysex', data=tx)
+        sent_at = time.perf_counter()
+        self.output_port.send(msg)
+        self._last_tx = tx
+        self._last_sent_at = sent_at
 
-        # Log to file
-        log_file.write(f"\n{'='*70}\n")
-        log_file.write(f"Command 0x{cmd:02X} ({cmd})\n")
-        log_file.write(f"TX: F0 {format_hex(result['tx'])} F7\n")
+        responses = []
+        deadline = time.monotonic() + timeout
+        while True:
+            wait = RESPONSE_IDLE if responses else deadline - time.monotonic()
+            if wait <= 0:
+                break
+            try:
+                arrived_at, payload = self._rx_queue.get(timeout=wait)
+            except queue.Empty:
+                break
+            if not responses:
+                self._record_latency(tx, arrived_at - sent_at)
+            responses.append(payload)
+
+        return responses
+
+    def _collect_late_replies(self):
+        """Drain replies that arrived after the last send_sysex() gave up."""
+        late = []
+        while True:
+            try:
+                late.append(self._rx_queue.get_nowait())
+            except queue.Empty:
+                break
+        if not late:
+            return
+
+        if self._last_tx is not None:
+            # Wait longer for this command next time; the shared timeout only
+            # learns from replies that arrived within their own window
+            cmd = self._last_tx[3]
+            latency = late[0][0] - self._last_sent_at
+            self._slowest[cmd] = max(latency, self._slowest.get(cmd, 0))
+        # Queued without _submit()'s failure check: this runs inside every
+        # send, including the exit-edit-mode send during cleanup, which must
+        # go out even after a report has failed
+        self._pending.append(self._worker.submit(
+            self._report_late, self._last_tx, [payload for _, payload in late]))
+
+    def _report_late(self, tx, responses):
+        """Log and print replies that missed their timeout (runs on the output worker)."""
+        buf = io.StringIO()
+        tx_str = f"F0 {format_hex(tx)} F7" if tx is not None else "(nothing sent)"
+        buf.write(f"\nLate reply to TX: {tx_str}\n")
+        for i, resp in enumerate(responses):
+            buf.write(f"RX[{i}]: F0 {format_hex(resp)} F7\n")
+            buf.write(f"       Length: {len(resp)} bytes\n")
+        self.log_file.write(buf.getvalue().encode())
+
+        for resp in responses:
+            print(f"  late reply to {tx_str}: {len(resp)} bytes")
+
+    def _on_msg(self, msg):
+        """mido input callback: queue every SysEx payload with its arrival time."""
+        if msg.type == 'sysex':
+            self._rx_queue.put_nowait((time.perf_counter(), bytes(msg.data)))
+
+    def _record_latency(self, tx, latency):
+        """Track reply latency and set the timeout to twice its 95th percentile."""
+        cmd = tx[3]
+        self._slowest[cmd] = max(latency, self._slowest.get(cmd, 0))
+        self._latencies.append(latency)
+        if len(self._latencies) >= LATENCY_SAMPLES:
+            p95 = statistics.quantiles(self._latencies, n=20)[-1]
+            self.timeout = max(MIN_TIMEOUT, 2 * p95)
+
+    def enter_edit_mode(self):
+        """Enter edit mode (required for many commands)."""
+        print("\nEntering edit mode...")
+        self.send_sysex([0x50])
+        time.sleep(0.2)
+        self.log_file.write(b"\nEntered edit mode (0x50)\n")
+
+    def exit_edit_mode(self):
+        """Exit edit mode."""
+        print("\nExiting edit mode...")
+        self.send_sysex([0x51])
+
+    def _submit(self, fn, *args):
+        """Queue output work on the worker, first re-raising any failed report."""
+        # The worker runs reports in order, so finished ones are at the front;
+        # checking them here stops the scan on the first failed log write
+        while self._pending and self._pending[0].done():
+            self._pending.popleft().result()
+        self._pending.append(self._worker.submit(fn, *args))
+
+    def drain(self):
+        """Wait until all queued log and console output has been written."""
+        self._pending.append(self._worker.submit(self._flush_console))
+        while self._pending:
+            self._pending.popleft().result()
+
+    def _flush_console(self):
+        """Write buffered compact sweep output (runs on the output worker)."""
+        if self._console:
+            sys.stdout.write(''.join(self._console))
+            sys.stdout.flush()
+            self._console.clear()
+
+    def close(self):
+        """Flush queued output and stop the output worker."""
+        self.drain()
+        self._worker.shutdown()
+
+    def scan_commands(self, start=0x00, end=0x7F):
+        """Scan all commands and log responses."""
+
+        print(f"\nScanning commands 0x{start:02X} to 0x{end:02X}...")
+        print(BANNER)
+
+        results = []
+
+        for cmd in range(start, end + 1):
+            # Send simple command (just the command byte)
+            responses = self.send_sysex([cmd])
+
+            result = {
+                'cmd': cmd,
+                'tx': SYSEX_PREFIX + bytes([cmd]),
+                'responses': responses
+            }
+            results.append(result)
+
+            # Analysis and output run on the worker while the next command
+            # waits for the device
+            self._submit(self._report_command, cmd, responses)
+
+        self.drain()
+        return results
+
+    def _report_command(self, cmd, responses):
+        """Log and print one command's responses (runs on the output worker)."""
+        # Log to file, assembled in memory and written once per command
+        buf = io.StringIO()
+        buf.write(f"\n{BANNER}\n")
+        buf.write(f"Command 0x{cmd:02X} ({cmd})\n")
+        buf.write(f"TX: F0 {_PREFIX_HEX} {cmd:02X} F7\n")
 
         if responses:
+            first_notes = None
             for i, resp in enumerate(responses):
-                log_file.write(f"RX[{i}]: F0 {format_hex(resp)} F7\n")
-                log_file.write(f"       Length: {len(resp)} bytes\n")
+                buf.write(f"RX[{i}]: F0 {format_hex(resp)} F7\n")
+                buf.write(f"       Length: {len(resp)} bytes\n")
 
                 notes = analyze_response(cmd, resp)
                 if notes:
-                    log_file.write(f"       Notes: {'; '.join(notes)}\n")
+                    buf.write(f"       Notes: {'; '.join(notes)}\n")
+                if first_notes is None:
+                    first_notes = notes
 
-            # Print summary to console
-            resp_len = len(responses[0]) if responses else 0
-            notes = analyze_response(cmd, responses[0]) if responses else []
-            note_str = f" | {'; '.join(notes)}" if notes else ""
+            # Print summary to console, reusing the first response's notes
+            resp_len = len(responses[0])
+            note_str = f" | {'; '.join(first_notes)}" if first_notes else ""
             print(f"0x{cmd:02X}: {len(responses)} response(s), {resp_len} bytes{note_str}")
         else:
-            log_file.write("RX: (no response)\n")
+            buf.write("RX: (no response)\n")
             print(f"0x{cmd:02X}: no response")
 
-        log_file.flush()
-
-    return results
-
-
-def scan_with_params(output_port, input_port, log_file, cmd, param_range):
-    """Scan a command with different parameter values."""
-    print(f"\nScanning command 0x{cmd:02X} with params 0x00-0x{param_range:02X}...")
-    print("-" * 70)
-
-    for param in range(param_range + 1):
-        responses = send_sysex(output_port, input_port, [cmd, param])
+        self.log_file.write(buf.getvalue().encode())
+
+    def scan_with_params(self, cmd, params=range(NUM_SLOTS), timeout=None,
+                         compact=False):
+        """
+        Send a command once per parameter value and log the responses.
+
+        Output is written in the background; call drain() before writing
+        to the log or console directly.
+
+        Args:
+            cmd: Command byte
+            params: Parameter values to send after the command byte
+                (default: every slot number)
+            timeout: Per-message response timeout in seconds
+                (default: the scanner's adaptive timeout)
+            compact: Show commands without responses only as a progress
+                line, and write console output in batches (for sweeping
+                every command)
+
+        Returns:
+            List of (param, response) tuples, one per response received
+        """
+        sent = []
+        param_responses = []
+
+        for param in params:
+            responses = self.send_sysex([cmd, param], timeout)
+            sent.append((param, responses))
+            param_responses.extend((param, resp) for resp in responses)
+
+        # Output for this command overlaps the next command's scan
+        self._submit(self._report_params, cmd, sent, param_responses, compact)
+
+        return param_responses
+
+    def _report_params(self, cmd, sent, param_responses, compact):
+        """Log and print one parameter sweep (runs on the output worker)."""
+        # Log output is assembled in memory and written once per command
+        buf = io.StringIO()
+        buf.write(f"\n{BANNER}\nCommand 0x{cmd:02X}\n{BANNER}\n")
+
+        # Only the parameter byte changes within this loop
+        tx_cmd_hex = f"{_PREFIX_HEX} {cmd:02X}"
+
+        for param, responses in sent:
+            tx_str = f"F0 {tx_cmd_hex} {param:02X} F7"
+
+            if responses:
+                for resp in responses:
+                    rx_str = f"F0 {format_hex(resp)} F7"
+                    buf.write(f"TX: {tx_str}\nRX: {rx_str} ({len(resp)} bytes)\n\n")
+            else:
+                buf.write(f"TX: {tx_str}\nRX: (no response)\n\n")
 
-        log_file.write(f"\nCommand 0x{cmd:02X} 0x{param:02X}\n")
-        log_file.write(f"TX: F0 {format_hex(SYSEX_PREFIX + [cmd, param])} F7\n")
+        self.log_file.write(buf.getvalue().encode())
 
-        if responses:
-            for resp in responses:
-                log_file.write(f"RX: F0 {format_hex(resp)} F7 ({len(resp)} bytes)\n")
-            print(f"  0x{cmd:02X} 0x{param:02X}: {len(responses[0])} bytes")
+        # Print summary to console
+        if not compact:
+            if param_responses:
+                print(f"\n0x{cmd:02X}: RESPONDS")
+                for param, resp in param_responses:
+                    print(f"  [{param}] {len(resp):3d} bytes: {format_hex(resp[:20])}{'...' if len(resp) > 20 else ''}")
+            else:
+                print(f"\n0x{cmd:02X}: no responses with params")
+            return
+
+        console = self._console
+        if param_responses:
+            console.append(f"\n0x{cmd:02X}: RESPONDS\n")
+            for param, resp in param_responses:
+                console.append(f"  [{param}] {len(resp):3d} bytes: {format_hex(resp[:20])}{'...' if len(resp) > 20 else ''}\n")
         else:
-            log_file.write("RX: (no response)\n")
+            # Just show progress
+            if cmd % 16 == 0:
+                console.append(f"0x{cmd:02X}...")
+            elif cmd % 16 == 15:
+                console.append(f" 0x{cmd:02X} (no responses)\n")
+
+        if cmd % CONSOLE_FLUSH_EVERY == CONSOLE_FLUSH_EVERY - 1:
+            self._flush_console()
 
 
 def main():
@@ -173,6 +401,10 @@ def main():
                         help='Start command (default: 0x00)')
     parser.add_argument('--end', type=lambda x: int(x, 0), default=0x7F,
                         help='End command (default: 0x7F)')
+    parser.add_argument('--mode', choices=('quick', 'params', 'full'), default='quick',
+                        help='quick: command byte only; params: also sweep slot '
+                             'params 0-5 on responding commands; full: sweep slot '
+                             'params on every command in the range (default: quick)')
     parser.add_argument('--no-edit', action='store_true',
                         help='Skip entering edit mode')
     args = parser.parse_args()
@@ -189,11 +421,7 @@ def main():
     try:
         output_port = mido.open_output(port_name)
         # Find matching input
-        input_port = None
-        for inp in mido.get_input_names():
-            if port_name.split(':')[0] in inp:
-                input_port = mido.open_input(inp)
-                break
+        input_port = open_matching_input(port_name)
         if not input_port:
             print("Could not find matching input port")
             sys.exit(1)
@@ -203,27 +431,48 @@ def main():
 
     print(f"Connected to: {port_name}")
 
-    # Open log file
-    with open(args.output, 'w') as log_file:
-        log_file.write(f"G3X Command Scan - {datetime.now().isoformat()}\n")
-        log_file.write(f"Port: {port_name}\n")
-        log_file.write(f"Range: 0x{args.start:02X} - 0x{args.end:02X}\n")
+    # Open log file unbuffered: every write goes straight to os.write(), and
+    # the scanner already batches its output into one write per command
+    with open(args.output, 'wb', buffering=0) as log_file:
+        log_file.write(f"G3X Command Scan - {datetime.now().isoformat()}\n"
+                       f"Port: {port_name}\n"
+                       f"Range: 0x{args.start:02X} - 0x{args.end:02X}\n"
+                       f"Mode: {args.mode}\n".encode())
+
+        scanner = G3XScanner(output_port, input_port, log_file)
 
         try:
             # Enter edit mode first (required for many commands)
             if not args.no_edit:
-                print("\nEntering edit mode...")
-                send_sysex(output_port, input_port, [0x50])
-                time.sleep(0.2)
-                log_file.write("\nEntered edit mode (0x50)\n")
+                scanner.enter_edit_mode()
 
             # Scan all commands
-            results = scan_commands(output_port, input_port, log_file,
-                                   args.start, args.end)
+            results = scanner.scan_commands(args.start, args.end)
+            responding = [r for r in results if r['responses']]
+
+            # Sweep slot params: params mode only on commands that answered
+            # at all, full mode on every command in the range
+            if args.mode == 'full':
+                sweep = [r['cmd'] for r in results]
+            elif args.mode == 'params':
+                sweep = [r['cmd'] for r in responding]
+            else:
+                sweep = []
+
+            param_responding = []
+            if sweep:
+                which = "responding " if args.mode == 'params' else ""
+                print(f"\nScanning {len(sweep)} {which}command(s) "
+                      f"with slot params 0-{NUM_SLOTS - 1}...")
+                print("-" * 70)
+                log_file.write(f"\n\n{BANNER}\nSLOT PARAMETER SCAN\n{BANNER}\n".encode())
+                for cmd in sweep:
+                    if scanner.scan_with_params(cmd, compact=args.mode == 'full'):
+                        param_responding.append(cmd)
+                scanner.drain()
 
             # Summary
-            responding = [r for r in results if r['responses']]
-            print(f"\n{'='*70}")
+            print(f"\n{BANNER}")
             print(f"Scan complete. {len(responding)}/{len(results)} commands responded.")
             print(f"Results saved to: {args.output}")
 
@@ -234,14 +483,29 @@ def main():
                     resp = r['responses'][0]
                     print(f"  0x{r['cmd']:02X}: {len(resp)} bytes")
 
-        finally:
-            # Exit edit mode
-            if not args.no_edit:
-                print("\nExiting edit mode...")
-                send_sysex(output_port, input_port, [0x51])
+            if args.mode != 'quick':
+                responding_hex = [f"0x{r['cmd']:02X}" for r in responding]
+                param_responding_hex = [f"0x{c:02X}" for c in param_responding]
+                print(f"\nCommands responding with slot params: {param_responding_hex}")
+                log_file.write(f"\n\n{BANNER}\nSUMMARY\n{BANNER}\n"
+                               f"Responding commands: {responding_hex}\n"
+                               f"Responding with slot params: {param_responding_hex}\n".encode())
 
-            output_port.close()
-            input_port.close()
+        finally:
+            try:
+                try:
+                    # Exit edit mode
+                    if not args.no_edit:
+                        scanner.exit_edit_mode()
+                finally:
+                    try:
+                        output_port.close()
+                    finally:
+                        input_port.close()
+            finally:
+                # Flushed last, so a failed report can't leave the pedal in
+                # edit mode or the ports open
+                scanner.close()
 
 
 if __name__ == '__main__':